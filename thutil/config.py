@@ -1,12 +1,60 @@
+import functools
 import json
+import os
+import re
+from collections import OrderedDict
 from pathlib import Path
 from typing import Union
 
 import yaml
 from cerberus import Validator
 
+try:  # C-accelerated loader/dumper (libyaml), ~3-10x faster than pure-Python
+    from yaml import CSafeDumper as SafeDumper
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeDumper, SafeLoader
+
 
 ### ANCHOR: YAML config
+@functools.lru_cache(maxsize=None)
+def _load_yaml_file(filename: str, mtime: float) -> dict:
+    """Load a YAML file, cached on `(filename, mtime)` so repeated reads of the same unchanged file skip parsing."""
+    ### Binary mode lets libyaml consume the stream without a decode pass
+    with open(filename, "rb") as f:
+        return yaml.load(f, Loader=SafeLoader)
+
+
+def _read_yaml_cached(filename: Union[str, Path]) -> dict:
+    """Read a YAML file through the mtime-keyed cache."""
+    filename = str(filename)
+    return _load_yaml_file(filename, os.path.getmtime(filename))
+
+
+def _json_key(data: dict):
+    """Canonical JSON dump of `data`, or None when a JSON round-trip would not preserve it (non-serializable values, non-string keys, ...)."""
+    try:
+        key = json.dumps(data, sort_keys=True)
+    except TypeError:
+        return None
+    return key if json.loads(key) == data else None
+
+
+@functools.lru_cache(maxsize=None)
+def _get_validator(schema_key: str, allow_unknown: bool, require_all: bool) -> Validator:
+    """Build a Cerberus Validator once per `(schema, options)` and reuse it.
+
+    `schema_key` is the canonical JSON dump of the schema dict, so identical schemas share one compiled validator.
+    """
+    schema_dict = json.loads(schema_key)
+    return Validator(schema_dict, allow_unknown=allow_unknown, require_all=require_all)
+
+
+### LRU of content hashes of (config, schema, options) that already validated clean
+_VALIDATED_CACHE = OrderedDict()
+_VALIDATED_CACHE_SIZE = 1024
+
+
 def validate_config(
     config_dict=None,
     config_file=None,
@@ -14,6 +62,7 @@ def validate_config(
     schema_file=None,
     allow_unknown=False,
     require_all=False,
+    cache=True,
 ):
     """Validate the config file with the schema file.
 
@@ -24,25 +73,50 @@ def validate_config(
         schema_file (str, optional): path to the YAML schema file, will override `schema_dict`. Defaults to None.
         allow_unknown (bool, optional): whether to allow unknown fields in the config file. Defaults to False.
         require_all (bool, optional): whether to require all fields in the schema file to be present in the config file. Defaults to False.
+        cache (bool, optional): whether to skip re-validation of an identical config/schema pair that already validated clean. Defaults to True.
 
     Raises:
         ValueError: if the config file does not match the schema
     """
     if not config_dict and config_file:
-        config_dict = yaml.safe_load(open(config_file))
+        config_dict = _read_yaml_cached(config_file)
     if not schema_dict and schema_file:
-        schema_dict = yaml.safe_load(open(schema_file))
+        schema_dict = _read_yaml_cached(schema_file)
 
     if not config_dict:
         raise ValueError("Must provide either `config_dict` or `config_file`")
     if not schema_dict:
         raise ValueError("Must provide either `schema_dict` or `schema_file`")
 
-    v = Validator(allow_unknown=allow_unknown, require_all=require_all)
-    res = v.validate(config_dict, schema_dict)
+    schema_key = _json_key(schema_dict)
+
+    ### Fast path: skip re-validation of an identical config against the same
+    ### schema. The full key tuple is stored, not its hash(): a 64-bit hash
+    ### collision between two pairs would silently skip validating an invalid
+    ### config, with no way to detect it once the strings are discarded
+    cache_key = None
+    if cache and schema_key is not None:
+        config_key = _json_key(config_dict)
+        if config_key is not None:
+            cache_key = (config_key, schema_key, allow_unknown, require_all)
+    if cache_key is not None and cache_key in _VALIDATED_CACHE:
+        _VALIDATED_CACHE.move_to_end(cache_key)
+        return
+
+    if schema_key is not None:
+        v = _get_validator(schema_key, allow_unknown, require_all)
+    else:
+        ### Schemas that do not survive a JSON round-trip (callables, compiled
+        ### regexes, sets, non-string keys, ...) get a one-off validator
+        v = Validator(schema_dict, allow_unknown=allow_unknown, require_all=require_all)
+    res = v.validate(config_dict)
     if not res:
         config_path = Path(config_file).as_posix() if config_file else ""
         raise ValueError(f"Error in the configuration file: {config_path} \n{v.errors}")
+    if cache_key is not None:
+        _VALIDATED_CACHE[cache_key] = True
+        if len(_VALIDATED_CACHE) > _VALIDATED_CACHE_SIZE:
+            _VALIDATED_CACHE.popitem(last=False)  # evict the least recently used
     return
 
 
@@ -55,15 +129,10 @@ def load_config(filename: Union[str, Path]) -> dict:
     Returns:
         jdata: (dict) The data loaded from the file
     """
-    if Path(filename).suffix in [".json", ".jsonc"]:
-        jdata = load_jsonc(filename)
-    elif Path(filename).suffix in [".yaml", ".yml"]:
-        from omegaconf import OmegaConf
-
-        conf = OmegaConf.load(filename)
-        jdata = OmegaConf.to_container(conf, resolve=True)
-    else:
+    loader = _CONFIG_LOADERS.get(Path(filename).suffix)
+    if loader is None:
         raise ValueError(f"Unsupported file format: {filename}")
+    jdata = loader(filename)
 
     if not jdata:
         jdata = {}
@@ -71,42 +140,61 @@ def load_config(filename: Union[str, Path]) -> dict:
     return jdata
 
 
+_COMMENT_RE = re.compile(r"//[^\n]*")
+
+
 def load_jsonc(filename: str) -> dict:
     """Load data from a JSON file that allow comments."""
-    with open(filename) as f:
-        lines = f.readlines()
-    cleaned_lines = [line.strip().split("//", 1)[0] for line in lines if line.strip()]
-    text = "\n".join(cleaned_lines)
-    jdata = json.loads(text)
+    text = Path(filename).read_text()  # single open/read/close
+    jdata = json.loads(_COMMENT_RE.sub("", text))
     return jdata
 
 
+def _load_yaml_omegaconf(filename: Union[str, Path]) -> dict:
+    """Load a YAML file, resolving variable-interpolation with OmegaConf when present."""
+    text = Path(filename).read_text()
+    if "${" not in text:  # no interpolation, the plain loader is enough
+        return yaml.load(text, Loader=SafeLoader)
+
+    from omegaconf import OmegaConf
+
+    conf = OmegaConf.create(text)
+    return OmegaConf.to_container(conf, resolve=True)
+
+
+### Map file suffix to its loader, one dict lookup per call in `load_config`
+_CONFIG_LOADERS = {
+    ".json": load_jsonc,
+    ".jsonc": load_jsonc,
+    ".yaml": _load_yaml_omegaconf,
+    ".yml": _load_yaml_omegaconf,
+}
+
+
 def unpack_dict(nested_dict: dict) -> dict:
     """Unpack one level of nested dictionary."""
-    # flat_dict = {
-    #     key2: val2 for key1, val1 in nested_dict.items() for key2, val2 in val1.items()
-    # }
-
-    ### Use for loop to handle duplicate keys
+    ### Set ops on dict keyviews and dict.update run at C speed, unlike a per-key Python loop
+    seen = set()
     flat_dict = {}
-    for key1, val1 in nested_dict.items():
-        for key2, val2 in val1.items():
-            if key2 not in flat_dict:
-                flat_dict[key2] = val2
-            else:
-                raise ValueError(f"Key `{key2}` is used multiple times in the same level of the nested dictionary. Please fix it before unpacking dict.")
+    for val1 in nested_dict.values():
+        keys = val1.keys()
+        dup_keys = seen & keys
+        if dup_keys:
+            raise ValueError(f"Key `{dup_keys.pop()}` is used multiple times in the same level of the nested dictionary. Please fix it before unpacking dict.")
+        seen |= keys
+        flat_dict.update(val1)
     return flat_dict
 
 
 def write_yaml(jdata: dict, filename: Union[str, Path]):
     """Write data to a YAML file."""
     with open(filename, "w") as f:
-        yaml.safe_dump(jdata, f, default_flow_style=False, sort_keys=False)
+        yaml.dump(jdata, f, Dumper=SafeDumper, default_flow_style=False, sort_keys=False)
     return
 
 
 def read_yaml(filename: Union[str, Path]) -> dict:
     """Read data from a YAML file."""
     with open(filename) as f:
-        jdata = yaml.safe_load(f)
+        jdata = yaml.load(f, Loader=SafeLoader)
     return jdata
@@ -2,40 +2,92 @@
 The dispatcher module is designed to submit and monitor jobs on remote machines. It is built on the top of the [dpdispatcher](https://docs.deepmodeling.com/projects/dpdispatcher) package.
 """
 
+from __future__ import annotations
+
 import asyncio
-import datetime
+import functools
+import json
 import logging
+import sys
 import time
 import warnings
-from copy import deepcopy
+from concurrent.futures import ThreadPoolExecutor
 from math import ceil
 from pathlib import Path
 
-from dpdispatcher import Machine, Resources, Submission, Task
-from dpdispatcher.dlog import dlog
+from thutil.stuff import text_color
+
+### dpdispatcher pulls in paramiko/SSH crypto at import; load it lazily so
+### users of the plain helpers do not pay the startup cost
+Machine = Resources = Submission = Task = None  # populated on first use
+
 
-from thutil.stuff import chunk_list, text_color
+def _import_dpdispatcher():
+    global Machine, Resources, Submission, Task
+    if Machine is None:
+        from dpdispatcher import Machine, Resources, Submission, Task  # noqa: PLW0603
+    return
 
 
 ##### SECTION: Dispatching jobs
+@functools.lru_cache(maxsize=1)
+def _local_root() -> str:
+    """Resolve the current working directory once and reuse it for every submission."""
+    return Path("./").resolve().as_posix()
+
+
+@functools.lru_cache(maxsize=None)
+def _get_machine(machine_key: str, machine_index: int) -> Machine:
+    """Build a Machine once per `(machine dict, machine_index)` and reuse it across the chunks of that machine.
+
+    `machine_key` is the canonical JSON dump of the machine dict. `machine_index` is part of the key because different machine entries run their chunks on separate executor threads: two entries with identical machine dicts must not share one Machine (and its single SSH transport) across those threads.
+    """
+    _import_dpdispatcher()
+    return Machine.load_from_dict(json.loads(machine_key))
+
+
+@functools.lru_cache(maxsize=None)
+def _get_resources(resources_key: str) -> Resources:
+    """Build a Resources once per distinct resources dict and reuse it across chunks."""
+    _import_dpdispatcher()
+    return Resources.load_from_dict(json.loads(resources_key))
+
+
 def _prepare_submission(
     mdict: dict,
     work_dir: str,
     task_list: list[Task],
-    forward_common_files: list[str] = [],
-    backward_common_files: list[str] = [],
+    forward_common_files: list[str] = None,
+    backward_common_files: list[str] = None,
+    machine_index: int = 0,
 ) -> Submission:
     """Function to simplify the preparation of the [Submission](https://docs.deepmodeling.com/projects/dpdispatcher/en/latest/api/dpdispatcher.html#dpdispatcher.Submission) object for dispatching jobs."""
+    ### `None` defaults avoid sharing one mutable list across calls
+    if forward_common_files is None:
+        forward_common_files = []
+    if backward_common_files is None:
+        backward_common_files = []
     machine_dict = mdict["machine"]
     resources_dict = mdict["resources"]
 
+    _import_dpdispatcher()
     ### revise input path to absolute path and as_string
-    abs_machine_dict = machine_dict.copy()
-    abs_machine_dict["local_root"] = Path("./").resolve().as_posix()
+    abs_machine_dict = dict(machine_dict, local_root=_local_root())  # copy + override in one C call
+
+    ### A cached Machine owns one SSH transport; with `max_concurrent_chunks > 1`
+    ### the executor threads of this machine would all poll through it at once,
+    ### so build a fresh Machine per chunk in that case. The serial default
+    ### caches per `(machine dict, machine_index)` — never across machine
+    ### entries, whose chunks also run on separate threads. Resources holds no
+    ### connection state and stays cached either way.
+    if mdict.get("max_concurrent_chunks", 1) > 1:
+        machine = Machine.load_from_dict(abs_machine_dict)
+    else:
+        machine = _get_machine(json.dumps(abs_machine_dict, sort_keys=True), machine_index)
 
     submission = Submission(
-        machine=Machine.load_from_dict(abs_machine_dict),
-        resources=Resources.load_from_dict(resources_dict),
+        machine=machine,
+        resources=_get_resources(json.dumps(resources_dict, sort_keys=True)),
         work_base=work_dir,
         task_list=task_list,
         forward_common_files=forward_common_files,
@@ -44,34 +96,19 @@ def _prepare_submission(
     return submission
 
 
-##### ANCHOR: Synchronous submission
-def submit_job_chunk(
+def _prepare_chunk_submissions(
     mdict: dict,
     work_dir: str,
     task_list: list[Task],
-    forward_common_files: list[str] = [],
-    backward_common_files: list[str] = [],
-    machine_index: int = 0,
-    Logger: object = None,
+    forward_common_files: list[str],
+    backward_common_files: list[str],
+    machine_index: int,
+    Logger: object,
+    run_stats: dict = None,
 ):
-    """Function to submit a jobs to the remote machine. The function will:
+    """Shared pipeline of `submit_job_chunk`/`async_submit_job_chunk`: log the machine assignment, split `task_list` into chunks, and yield one prepared Submission per chunk.
 
-        - Prepare the task list
-        - Make the submission of jobs to remote machines
-        - Wait for the jobs to finish and download the results to the local machine
-
-    Args:
-        mdict (dict): a dictionary contains both the `machine_dict` and `resources_dict` of one remote machine. The parameters follow the dpdispatcher's [Machine](https://docs.deepmodeling.com/projects/dpdispatcher/en/latest/machine.html#machine-parameters) and [Resources](https://docs.deepmodeling.com/projects/dpdispatcher/en/latest/resources.html#resources-parameters) classes. See the [mdict schema](https://thangckt.github.io/alff_doc/schema/config_machine/) for more details.
-        work_dir (str): the working directory.
-        task_list (list[Task]): a list of Task objects. Each task object contains the command to be executed on the remote machine, and the files to be copied to and from the remote machine. The dirs of each task must be relative to the `work_dir`.
-        forward_common_files (list[str]): common files used for all tasks. These files are i n the `work_dir`.
-        backward_common_files (list[str]): common files to download from the remote machine when the jobs are finished.
-        machine_index (int): index of the machine in the list of machines.
-        Logger (object): the logger object to be used for logging.
-
-    Note:
-    - Split the `task_list` into chunks to control the number of jobs submitted at once.
-    - Should not use the `Local` contexts, it will interference the current shell environment which leads to the unexpected behavior on local machine. Instead, use another account to connect local machine with `SSH` context.
+    When the mdict sets `target_chunk_seconds`, the chunk size adapts between chunks: the last measured chunk runtime (reported by the workers through `run_stats`) scales `job_limit` toward the target, clipped to [`job_limit_min`, `job_limit_max`]. Without that key the chunk size stays fixed.
     """
     num_tasks = len(task_list)
     machine_dict = mdict["machine"]
@@ -81,32 +118,43 @@ def submit_job_chunk(
     )
     Logger.info(text)
 
-    ### Divide task_list into chunks
+    ### Divide task_list into chunks; re-slice from the remaining tail so the
+    ### chunk size can change between iterations
     job_limit = mdict.get("job_limit", 5)
-    chunks = chunk_list(task_list, job_limit)
-    old_time = None
-    for chunk_index, task_list_current_chunk in enumerate(chunks):
-        num_tasks_current_chunk = len(task_list_current_chunk)
-        new_time = time.time()
+    target_seconds = mdict.get("target_chunk_seconds")
+    job_limit_min = mdict.get("job_limit_min", 1)
+    job_limit_max = mdict.get("job_limit_max", job_limit)
+    total_chunks = ceil(num_tasks / job_limit)  # estimate with the initial size
+    start = 0
+    chunk_index = 0
+    while start < num_tasks:
+        if target_seconds and run_stats and run_stats.get("elapsed_s"):
+            scaled = int(job_limit * target_seconds / max(run_stats["elapsed_s"], 1.0))
+            new_limit = min(max(scaled, job_limit_min), job_limit_max)
+            if new_limit != job_limit:
+                Logger.debug(f"Machine {machine_index}: adapt job_limit {job_limit} -> {new_limit}")
+                job_limit = new_limit
+        task_list_current_chunk = task_list[start : start + job_limit]
+        start += len(task_list_current_chunk)
         text = info_current_dispatch(
             num_tasks,
-            num_tasks_current_chunk,
+            len(task_list_current_chunk),
             job_limit,
             chunk_index,
-            old_time,
-            new_time,
+            elapsed_s=run_stats.get("elapsed_s") if run_stats else None,
+            machine_index=machine_index,
+            total_chunks=total_chunks,
         )
         Logger.info(text)
-        submission = _prepare_submission(
+        yield _prepare_submission(
             mdict=mdict,
             work_dir=work_dir,
             task_list=task_list_current_chunk,
             forward_common_files=forward_common_files,
             backward_common_files=backward_common_files,
+            machine_index=machine_index,
         )
-        submission.run_submission()
-        old_time = new_time
-    return
+        chunk_index += 1
 
 
 ##### ANCHOR: Asynchronous submission
@@ -114,76 +162,144 @@ async def async_submit_job_chunk(
     mdict: dict,
     work_dir: str,
     task_list: list[Task],
-    forward_common_files: list[str] = [],
-    backward_common_files: list[str] = [],
+    forward_common_files: list[str] = None,
+    backward_common_files: list[str] = None,
     machine_index: int = 0,
     Logger: object = None,
 ):
-    """Convert `submit_job_chunk()` into an async function but only need to wait for the completion of the entire `for` loop (without worrying about the specifics of each operation inside the loop)
+    """Function to submit jobs to the remote machine. The function will:
+
+        - Prepare the task list
+        - Make the submission of jobs to remote machines
+        - Wait for the jobs to finish and download the results to the local machine
+
+    Args:
+        mdict (dict): a dictionary contains both the `machine_dict` and `resources_dict` of one remote machine. The parameters follow the dpdispatcher's [Machine](https://docs.deepmodeling.com/projects/dpdispatcher/en/latest/machine.html#machine-parameters) and [Resources](https://docs.deepmodeling.com/projects/dpdispatcher/en/latest/resources.html#resources-parameters) classes. See the [mdict schema](https://thangckt.github.io/alff_doc/schema/config_machine/) for more details.
+        work_dir (str): the working directory.
+        task_list (list[Task]): a list of Task objects. Each task object contains the command to be executed on the remote machine, and the files to be copied to and from the remote machine. The dirs of each task must be relative to the `work_dir`.
+        forward_common_files (list[str]): common files used for all tasks. These files are i n the `work_dir`.
+        backward_common_files (list[str]): common files to download from the remote machine when the jobs are finished.
+        machine_index (int): index of the machine in the list of machines.
+        Logger (object): the logger object to be used for logging.
 
     Note:
-        - An async function normally contain a `await ...` statement to be awaited (yield control to event loop)
-        - If the 'event loop is blocked' by a asynchronous function (it will not yield control to event loop), the async function will wait for the completion of the synchronous function. So, the async function will not be executed asynchronously. Try to use `await asyncio.to_thread()` to run the synchronous function in a separate thread, so that the event loop is not blocked.
+    - Split the `task_list` into chunks to control the number of jobs submitted at once.
+    - Should not use the `Local` contexts, it will interference the current shell environment which leads to the unexpected behavior on local machine. Instead, use another account to connect local machine with `SSH` context.
+    - The blocking `run_submission` calls are offloaded to threads, so the event loop stays free to drive the other machines concurrently.
     """
-    num_tasks = len(task_list)
-    machine_dict = mdict["machine"]
-    text = text_color(
-        f"Assigned {num_tasks} jobs to Machine {machine_index} \n{remote_info(machine_dict)}",
-        color=_COLOR_MAP[machine_index],
+    ### Feed prepared submissions through the bounded per-machine queue: the
+    ### workers run up to `max_concurrent_chunks` chunks at a time (each chunk
+    ### holds at most `job_limit` jobs) while the next chunks are being
+    ### prepared, and `queue.put` applies backpressure once the queue is full.
+    max_concurrent_chunks = mdict.get("max_concurrent_chunks", 1)
+    worker_state = _get_machine_worker(machine_index, max_concurrent_chunks)
+    worker_state["num_producers"] += 1
+    queue = worker_state["queue"]
+    submissions = _prepare_chunk_submissions(
+        mdict=mdict,
+        work_dir=work_dir,
+        task_list=task_list,
+        forward_common_files=forward_common_files,
+        backward_common_files=backward_common_files,
+        machine_index=machine_index,
+        Logger=Logger,
+        run_stats=worker_state["run_stats"],
     )
-    Logger.info(text)
+    try:
+        for submission in submissions:
+            await queue.put(submission)
+        await queue.join()  # wait until the workers have drained the queue
+    finally:
+        ### Concurrent callers for the same machine share one queue/worker set;
+        ### only the last producer out sends the sentinels and shuts down, so an
+        ### early finisher (or an exception above) cannot kill the workers while
+        ### another producer still has chunks queued
+        worker_state["num_producers"] -= 1
+        if worker_state["num_producers"] == 0:
+            ### Unregister before the first await below: a new producer arriving
+            ### while we drain the sentinels must get a fresh worker set from
+            ### `_get_machine_worker`, not this dying one whose workers are
+            ### about to exit (its submissions would then never be consumed)
+            _machine_workers.pop(machine_index, None)
+            for _ in worker_state["workers"]:
+                await queue.put(None)  # sentinel: no more chunks for this machine
+            await asyncio.gather(*worker_state["workers"])
+            worker_state["executor"].shutdown(wait=False)
+    return
 
-    ### Divide task_list into chunks
-    job_limit = mdict.get("job_limit", 5)
-    chunks = chunk_list(task_list, job_limit)
-    timer = {f"oldtime_{machine_index}": None}  # dynamic variable name
-    for chunk_index, task_list_current_chunk in enumerate(chunks):
-        num_tasks_current_chunk = len(task_list_current_chunk)
-        timer[f"newtime_{machine_index}"] = time.time()
-        text = info_current_dispatch(
-            num_tasks,
-            num_tasks_current_chunk,
-            job_limit,
-            chunk_index,
-            timer[f"oldtime_{machine_index}"],
-            timer[f"newtime_{machine_index}"],
-            machine_index,
-        )
-        Logger.info(text)
-        submission = _prepare_submission(
+
+##### ANCHOR: Synchronous submission
+def submit_job_chunk(
+    mdict: dict,
+    work_dir: str,
+    task_list: list[Task],
+    forward_common_files: list[str] = None,
+    backward_common_files: list[str] = None,
+    machine_index: int = 0,
+    Logger: object = None,
+):
+    """Synchronous entry point: run `async_submit_job_chunk` to completion. Takes the same arguments.
+
+    Note:
+        This wrapper drives its own event loop with `asyncio.run`, so it cannot be called from inside a running loop (that raises a RuntimeError); use `async_submit_job_chunk` there instead.
+    """
+    return asyncio.run(
+        async_submit_job_chunk(
             mdict=mdict,
             work_dir=work_dir,
-            task_list=task_list_current_chunk,
+            task_list=task_list,
             forward_common_files=forward_common_files,
             backward_common_files=backward_common_files,
+            machine_index=machine_index,
+            Logger=Logger,
         )
-        # await asyncio.to_thread(submission.run_submission, check_interval=30)  # this is old, may cause (10054) error
-        await run_submission_wrapper(submission, check_interval=30, machine_index=machine_index)
-        timer[f"oldtime_{machine_index}"] = timer[f"newtime_{machine_index}"]
-    return
-
-
-_machine_locks = {}  # Dictionary to store per-machine locks
+    )
 
 
-def _get_machine_lock(machine_index):
-    if machine_index not in _machine_locks:
-        _machine_locks[machine_index] = asyncio.Lock()
-    return _machine_locks[machine_index]
+_machine_workers = {}  # machine_index -> worker-state dict shared by concurrent producers
 
 
-async def run_submission_wrapper(submission, check_interval=30, machine_index=0):
-    """Ensure only one instance of 'submission.run_submission' runs at a time.
-    - If use one global lock for all machines, it will prevent concurrent execution of submissions on different machines. Therefore, each machine must has its own lock, so different machines can process jobs in parallel.
+def _get_machine_worker(machine_index, max_concurrent_chunks: int = 1):
+    """Lazily create the bounded submission queue, its consumer tasks, and a dedicated thread executor for one machine.
+    - One worker per machine serializes the chunks of that machine while different machines still run in parallel. Machines whose scheduler can take more load may set `max_concurrent_chunks` in their `mdict` to keep several chunks in flight at once.
+    - Each machine gets its own executor: `run_submission` blocks on remote polling for minutes, and routing it through the shared default pool (as `asyncio.to_thread` does) would let a few machines starve every other `to_thread` user in the process.
+    - The check-then-create below has no `await` between the membership test and the assignment, so it cannot race under asyncio's single-threaded scheduling; revisit if this module is ever driven from multiple threads.
     """
-    lock = _get_machine_lock(machine_index)  # Get per-machine lock
-    async with lock:  # Prevents concurrent execution
+    if machine_index not in _machine_workers:
+        queue = asyncio.Queue(maxsize=2)
+        executor = ThreadPoolExecutor(
+            max_workers=max_concurrent_chunks,
+            thread_name_prefix=f"dispatch-m{machine_index}",
+        )
+        run_stats = {"elapsed_s": None}  # last measured chunk runtime, read by the producer
+        workers = [asyncio.create_task(_run_submission_worker(queue, executor, run_stats)) for _ in range(max_concurrent_chunks)]
+        _machine_workers[machine_index] = {
+            "queue": queue,
+            "workers": workers,
+            "executor": executor,
+            "run_stats": run_stats,
+            "num_producers": 0,  # reference count of active async_submit_job_chunk calls
+        }
+    return _machine_workers[machine_index]
+
+
+async def _run_submission_worker(queue: asyncio.Queue, executor: ThreadPoolExecutor, run_stats: dict):
+    """Consume prepared submissions one at a time until the `None` sentinel arrives."""
+    loop = asyncio.get_running_loop()
+    while True:
+        submission = await queue.get()
+        if submission is None:
+            queue.task_done()
+            break
+        start_ns = time.monotonic_ns()
         try:
-            await asyncio.to_thread(submission.run_submission, check_interval=check_interval)
+            await loop.run_in_executor(executor, functools.partial(submission.run_submission, check_interval=30))
         except Exception as e:
             print(f"Error in dispatcher submission: {e}")
         finally:
+            run_stats["elapsed_s"] = (time.monotonic_ns() - start_ns) / 1e9
             del submission  # free up memory
+            queue.task_done()  # acknowledge for the producers' queue.join()
     return
 
 
@@ -196,35 +312,40 @@ def info_current_dispatch(
     num_tasks_current_chunk: int,
     job_limit,
     chunk_index,  # start from 0
-    old_time=None,
-    new_time=None,
+    elapsed_s=None,  # runtime of the previous chunk in seconds
     machine_index=0,
+    total_chunks=None,
 ) -> str:
     """Return the information of the current chunk of tasks."""
-    total_chunks = ceil(num_tasks / job_limit)
+    if total_chunks is None:
+        total_chunks = ceil(num_tasks / job_limit)
     remaining_tasks = num_tasks - chunk_index * job_limit
     text = f"Machine {machine_index}, is running {num_tasks_current_chunk} of {remaining_tasks} jobs (chunk {chunk_index + 1}/{total_chunks})."
-    ### estimate time remaining
-    if old_time is not None and new_time is not None:
-        time_elapsed = new_time - old_time
-        time_remaining = time_elapsed * (total_chunks - chunk_index)
-        duration = str(datetime.timedelta(seconds=time_remaining))
-        hm_format = ":".join(str(duration).split(":")[:-1])
-        text += f" Time left {hm_format}"
+    ### estimate time remaining from the last measured chunk runtime
+    if elapsed_s is not None:
+        time_remaining = int(elapsed_s * (total_chunks - chunk_index))
+        hours, remainder = divmod(time_remaining, 3600)
+        minutes = remainder // 60
+        text += f" Time left {hours}:{minutes:02d}"
     text = text_color(text, color=_COLOR_MAP[machine_index])  # make color
     return text
 
 
+_INDENT = " " * 11
+
+
+@functools.lru_cache(maxsize=None)
+def _remote_info_text(hostname: str, remote_path: str) -> str:
+    """Format (and cache) the remote banner for one host/path pair."""
+    return f"{_INDENT}Remote host: {hostname}\n{_INDENT}Remote path: {remote_path}"
+
+
 def remote_info(machine_dict) -> str:
     """Return the remote machine information.
     Args:
         mdict (dict): the machine dictionary
     """
-    remote_path = machine_dict["remote_root"]
-    hostname = machine_dict["remote_profile"]["hostname"]
-    info_text = f"{' ' * 11}Remote host: {hostname}\n"
-    info_text += f"{' ' * 11}Remote path: {remote_path}"
-    return info_text
+    return _remote_info_text(machine_dict["remote_profile"]["hostname"], machine_dict["remote_root"])
 
 
 ##### !SECTION
@@ -254,18 +375,28 @@ def _prepare_task_list_alff(
     Returns:
         list[Task]: a list of Task objects.
     """
+    _import_dpdispatcher()
+    ### Join the commands once; the single string object is shared by every task
     command = " &&\n".join(command_list)
+    ### Intern the strings shared by every task so all N instances reference the
+    ### same objects instead of carrying duplicated copies
+    forward_files = [sys.intern(f) for f in forward_files]
+    backward_files = [sys.intern(f) for f in backward_files]
+    outlog = sys.intern(outlog)
+    errlog = sys.intern(errlog)
+    TaskCls = Task  # local alias skips the global lookup per task
     ### Define the task_list
-    task_list = [None] * len(task_dirs)
-    for i, path in enumerate(task_dirs):
-        task_list[i] = Task(
-            command=command_list,
+    task_list = [
+        TaskCls(
+            command=command,
             task_work_path=path,
             forward_files=forward_files,
             backward_files=backward_files,
             outlog=outlog,
             errlog=errlog,
         )
+        for path in task_dirs
+    ]
     return task_list
 
 
@@ -277,8 +408,8 @@ async def async_submit_job_multi_remotes(
     task_dirs: list[str],
     forward_files: list[str],
     backward_files: list[str],
-    forward_common_files: list[str] = [],
-    backward_common_files: list[str] = [],
+    forward_common_files: list[str] = None,
+    backward_common_files: list[str] = None,
     mdict_prefix: str = "dft",
     Logger: object = None,
 ):
@@ -293,25 +424,29 @@ async def async_submit_job_multi_remotes(
     num_machines = len(remote_machine_list)
     Logger.info(f"Distribute {len(task_dirs)} jobs across {num_machines} remote machines")
 
-    remain_task_dirs = deepcopy(task_dirs)
+    ### Walk `task_dirs` with an index cursor: each machine takes one slice, no
+    ### copy of the remaining tail is rebuilt per iteration
+    num_total_tasks = len(task_dirs)
+    start = 0
     background_runs = []
     for i, cur_mdict in enumerate(remote_machine_list):
         current_work_load = cur_mdict.get("work_load_ratio", None)
 
         ### Divide task_dirs
+        num_remain_tasks = num_total_tasks - start
         if not current_work_load:
             current_work_load = 1.0 / num_machines
-            num_jobs = ceil(len(remain_task_dirs) * current_work_load)
+            num_jobs = ceil(num_remain_tasks * current_work_load)
         else:
-            num_jobs = ceil(len(task_dirs) * current_work_load)
+            num_jobs = ceil(num_total_tasks * current_work_load)
 
-        if num_jobs <= len(remain_task_dirs):
-            current_task_dirs = remain_task_dirs[:num_jobs]
-            remain_task_dirs = remain_task_dirs[num_jobs:]
+        if num_jobs <= num_remain_tasks:
+            current_task_dirs = task_dirs[start : start + num_jobs]
+            start += num_jobs
             num_machines -= 1
         else:
-            current_task_dirs = remain_task_dirs
-            remain_task_dirs = []
+            current_task_dirs = task_dirs[start:]
+            start = num_total_tasks
 
         ### Prepare task_list
         command_list = prepare_command_list(cur_mdict)
@@ -351,10 +486,12 @@ _DEFAULT_LOG_FILE = f"{time.strftime('%y%b%d_%H%M%S')}_dispatch.log"
 
 def change_logpath_dispatcher(newlogfile: str = _DEFAULT_LOG_FILE):
     """Change the logfile of dpdispatcher."""
+    from dpdispatcher.dlog import dlog
+
     try:
-        for hl in dlog.handlers[:]:  # Remove all old handlers
+        for hl in dlog.handlers:  # Remove all old handlers
             hl.close()
-            dlog.removeHandler(hl)
+        dlog.handlers.clear()  # in-place, no list copy or per-handler removeHandler
 
         fh = logging.FileHandler(newlogfile)
         fmt = logging.Formatter(
@@ -1,5 +1,6 @@
+import functools
 import logging
-import subprocess
+from itertools import chain
 from pathlib import Path
 
 from thutil.stuff import text_fill_center, text_fill_left  # noqa: F401
@@ -49,6 +50,11 @@ def create_logger(
     Logger = logging.getLogger(logger_name)
     Logger.setLevel(c_level)  # Ensures the logger can handle the specified log level
 
+    # Reuse the logger if it is already configured: repeated calls would otherwise
+    # stack duplicate handlers (each line emitted N times) and leak file descriptors
+    if Logger.handlers:
+        return Logger
+
     # Create console handler
     c_handler = logging.StreamHandler()
     c_handler.setLevel(c_level)
@@ -100,13 +106,16 @@ def _install_package(
         git_repo (str): git path for the package. Default: None. E.g., http://somthing.git
         conda_channel (str): conda channel for the package. Default: None. E.g., conda-forge
     """
+    import subprocess
+
     try:
         print(f"Installing package: `{package_name}` ...")
-        command = f"pip install -U {package_name}"
+        ### List form: no shell process, no string parsing
+        command = ["pip", "install", "-U", package_name]
         if git_repo:
-            command = f"pip install -U git+{git_repo}"
-        else:
-            command = f"conda install -c {conda_channel} {package_name}"
+            command = ["pip", "install", "-U", f"git+{git_repo}"]
+        elif conda_channel:
+            command = ["conda", "install", "-c", conda_channel, package_name]
         subprocess.run(command, check=True)
         print("Install successfully!")
     except subprocess.CalledProcessError as e:
@@ -114,15 +123,20 @@ def _install_package(
     return
 
 
-def get_func_args(func):
-    """Get the arguments of a function"""
+@functools.lru_cache(maxsize=1024)
+def _get_func_args_cached(func) -> dict:
+    """Introspect `func` once; the argspec is a pure function of its code object."""
     import inspect
 
     argspec = inspect.getfullargspec(func)
-    no_default_args = ["no_default_value"] * (len(argspec.args) - len(argspec.defaults))
-    all_values = no_default_args + list(argspec.defaults)
-    argsdict = dict(zip(argspec.args, all_values))
-    return argsdict
+    defaults = argspec.defaults or ()
+    no_default_args = ["no_default_value"] * (len(argspec.args) - len(defaults))
+    return dict(zip(argspec.args, chain(no_default_args, defaults)))
+
+
+def get_func_args(func):
+    """Get the arguments of a function"""
+    return dict(_get_func_args_cached(func))  # copy so callers cannot mutate the cache
 
 
 def dependency_info(
@@ -134,17 +148,18 @@ def dependency_info(
     ],
 ) -> str:
     """Get the dependency information"""
+    row = "{:>12}  {:<12} {}\n".format  # bind the format once for the loop
     text = "{}\n".format(text_fill_center("Dependencies", max_length=70))
     for pkg in modules:
         try:
             mm = __import__(pkg)
             ver = mm.__version__.split("+")[0]
             path = mm.__path__[0]
-            text += "{:>12}  {:<12} {}\n".format(pkg, ver, Path(path).as_posix())
+            text += row(pkg, ver, Path(path).as_posix())
         except ImportError:
-            text += "{:>12}  {:<12} {}\n".format(pkg, "unknown", "")
+            text += row(pkg, "unknown", "")
         except AttributeError:
-            text += "{:>12}  {:<12} {}\n".format(pkg, "", "unknown version or path")
+            text += row(pkg, "", "unknown version or path")
     ### Python version
     mm = __import__("sys")
     text += "{:>12}  {:<12} {}\n".format(
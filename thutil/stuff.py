@@ -1,81 +1,111 @@
 import base64
 import random
+import re
+import secrets
 import string
 import time
+from functools import lru_cache
+from itertools import chain, islice
 from typing import Generator
 
+__all__ = [
+    "chunk_list",
+    "unpack_indices",
+    "text_fill_center",
+    "text_fill_left",
+    "text_fill_box",
+    "text_color",
+    "time_uuid",
+    "simple_uuid",
+]
+
 
 def chunk_list(input_list: list, n: int) -> Generator:
-    """Yield successive n-sized chunks from `input_list`."""
-    for i in range(0, len(input_list), n):
-        yield input_list[i : i + n]
+    """Yield successive n-sized chunks from `input_list`. Works with any iterable, consuming it lazily without per-chunk index arithmetic."""
+    it = iter(input_list)
+    while chunk := list(islice(it, n)):
+        yield chunk
 
 
 ### ANCHOR: index tools
+_RANGE_RE = re.compile(r"^(\d+)-(\d+)(?::(\d+))?$")  # "start-end" or "start-end:step"
+
+
 def unpack_indices(list_inputs: list[int | str]) -> list[int]:
     """Expand the input list of indices to a list of integers.
     Eg: list_inputs = [1, 2, "3-5:2", "6-10"]
     """
-    idx = []
+    ### Fast path: plain integer lists need no parsing at all
+    if all(isinstance(item, int) for item in list_inputs):
+        return list(list_inputs)
+
+    parts = []
     for item in list_inputs:
         if isinstance(item, int):
-            idx.append(item)
+            parts.append((item,))
         elif isinstance(item, str):
-            parts = item.split(":")
-            step = int(parts[1]) if len(parts) > 1 else 1
-            start, end = map(int, parts[0].split("-"))
-            idx.extend(range(start, end + 1, step))
-    return idx
+            m = _RANGE_RE.match(item)
+            if not m:
+                raise ValueError(f"Invalid index range: `{item}`")
+            start, end, step = m.groups()
+            parts.append(range(int(start), int(end) + 1, int(step) if step else 1))
+    ### Materialize all ranges in one C-level pass instead of per-element appends
+    return list(chain.from_iterable(parts))
 
 
 ### ANCHOR: string modifier
+@lru_cache(maxsize=32)
+def _left_margin(fill: str, left_margin: int) -> str:
+    """Cache the repeated-fill prefix per (fill, margin) pair."""
+    return fill * left_margin
+
+
 def text_fill_center(input_text="example", fill="-", max_length=60):
     """Create a line with centered text."""
-    text = f" {input_text} "
-    return text.center(max_length, fill)
+    return f" {input_text} ".center(max_length, fill)
 
 
 def text_fill_left(input_text="example", left_margin=15, fill="-", max_length=60):
     """Create a line with left-aligned text."""
-    text = f"{(fill * left_margin)} {input_text} "
-    return text.ljust(max_length, fill)
+    return f"{_left_margin(fill, left_margin)} {input_text} ".ljust(max_length, fill)
 
 
 def text_fill_box(input_text="", fill=" ", sp="|", max_length=60):
     """Put the string at the center of |  |."""
     strs = input_text.center(max_length, fill)
-    box_text = sp + strs[1 : len(strs) - 1 :] + sp
-    return box_text
+    return sp + strs[1:-1] + sp
+
+
+### ANSI escape codes, hoisted to module scope so `text_color` does a single lookup per call
+_COLOR_PREFIX = {
+    "red": "\033[91m",
+    "green": "\033[92m",
+    "yellow": "\033[93m",
+    "blue": "\033[94m",
+    "purple": "\033[95m",
+    "cyan": "\033[96m",
+    "white": "\033[97m",
+    "bold": "\033[1m",
+    "underline": "\033[4m",
+    "nocolor": "\033[0m",  # reset color
+}
+_COLOR_RESET = "\033[0m"
 
 
 def text_color(text: str, color: str = "blue") -> str:
     """ANSI escape codes for color the text."""
-    color_dict = {
-        "red": "\033[91m",
-        "green": "\033[92m",
-        "yellow": "\033[93m",
-        "blue": "\033[94m",
-        "purple": "\033[95m",
-        "cyan": "\033[96m",
-        "white": "\033[97m",
-        "bold": "\033[1m",
-        "underline": "\033[4m",
-        "nocolor": "\033[0m",  # reset color
-    }
-    text = color_dict[color] + text + color_dict["nocolor"]
-    return text
+    return f"{_COLOR_PREFIX[color]}{text}{_COLOR_RESET}"
+
+
+_B64_TRANS = bytes.maketrans(b"-", b"_")  # translate on bytes beats str.replace
 
 
 def time_uuid() -> str:
-    timestamp = int(time.time() * 1.0e6)
-    rand = random.getrandbits(10)
-    unique_value = (timestamp << 10) | rand  # Combine timestamp + random bits
-    text = base64.urlsafe_b64encode(unique_value.to_bytes(8, "big")).decode().rstrip("=")
-    return text.replace("-", "_")
+    raw = time.time_ns().to_bytes(8, "big") + secrets.token_bytes(2)  # timestamp + random bits
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").translate(_B64_TRANS).decode()
 
 
 def simple_uuid():
     """Generate a simple random UUID of 4 digits."""
-    rnd_letter = random.choice(string.ascii_uppercase)  # ascii_letters
-    rnd_num = random.randint(100, 999)
-    return f"{rnd_letter}{rnd_num}"
+    letter, num = divmod(random.randrange(26 * 900), 900)  # one PRNG call instead of two
+    return f"{string.ascii_uppercase[letter]}{num + 100}"